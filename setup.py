@@ -30,8 +30,10 @@ setuptools.setup(
         "numpy>=1.14",
         "pandas>=1.1.4",
         # utilities
+        "cachetools>=5.0",
         "deprecated",
         "dill",
+        "diskcache",
         "rich",
         "tqdm",
         "wasabi",
@@ -6,3 +6,6 @@ http://www.robin-stocks.com/en/latest/index.html
 from .asset import RobinhoodRealItem
 from .market import RobinhoodPseudoMarket, RobinhoodRealMarket
 from .portfolio import RobinhoodRealPortfolio
+from .utils import configure_session
+
+configure_session()
@@ -2,13 +2,14 @@
 Specialized assets in the Robinhood scenario.
 """
 from tr4d3r.core.asset import Item
-from tr4d3r.utils.misc import timed_lru_cache
 from .utils import symbol_to_market_mic
 from .market import RobinhoodRealMarket
 import robin_stocks.robinhood as rh
 
 
 class RobinhoodRealItem(Item):
+    __slots__ = ("market_mic",)
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.correct_quantity()
@@ -31,17 +32,28 @@ class RobinhoodRealItem(Item):
         unit_cost = data_dict["average_buy_price"]
         return cls(symbol, quantity, unit_cost)
 
-    @timed_lru_cache(seconds=60)
+    def _cached_price(self, kind, fetcher):
+        return RobinhoodRealMarket.cached_price(
+            self.name, kind, fetcher, mic=self.market_mic
+        )
+
     def unit_price(self):
-        price_list = rh.get_latest_price(self.name, includeExtendedHours=True)
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.get_latest_price(self.name, includeExtendedHours=True)
+            return list(map(float, price_list))[0]
+
+        return self._cached_price("extended", fetcher)
 
-    @timed_lru_cache(seconds=60)
     def bid_price(self):
-        price_list = rh.get_latest_price(self.name, "bid_price")
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.get_latest_price(self.name, "bid_price")
+            return list(map(float, price_list))[0]
+
+        return self._cached_price("bid", fetcher)
 
-    @timed_lru_cache(seconds=60)
     def ask_price(self):
-        price_list = rh.get_latest_price(self.name, "ask_price")
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.get_latest_price(self.name, "ask_price")
+            return list(map(float, price_list))[0]
+
+        return self._cached_price("ask", fetcher)
@@ -2,11 +2,36 @@ import wrappy
 import numpy as np
 import pandas as pd
 import robin_stocks.robinhood as rh
+import os
+import time
+from cachetools import TLRUCache
+from collections import defaultdict
+from diskcache import Cache
+from functools import lru_cache
+from requests.exceptions import RequestException
+from threading import Lock
 from tqdm import tqdm
 from datetime import datetime, timezone
 from pprint import pformat
 from tr4d3r.core.market import PseudoTimeMarket, RealTimeMarket
 from tr4d3r.utils.misc import autodatetime, decimal_floor
+from .utils import seconds_until_open
+
+# (symbol, kind) -> (price, ttl), shared by all markets and items
+PRICE_CACHE = TLRUCache(maxsize=512, ttu=lambda _k, _v, _now: _now + _v[1])
+PRICE_CACHE_LOCK = Lock()
+# one lock per (symbol, kind), so concurrent misses on a key fetch only once
+PRICE_KEY_LOCKS = defaultdict(Lock)
+PRICE_DISK_CACHE_DIR = os.path.join("~", ".tr4d3r", "price_cache")
+
+
+@lru_cache(maxsize=1)
+def price_disk_cache():
+    """
+    On-disk layer behind PRICE_CACHE, so fresh prices survive restarts.
+    Opened on first use to avoid creating directories at import time.
+    """
+    return Cache(os.path.expanduser(PRICE_DISK_CACHE_DIR))
 
 
 @wrappy.memoize(
@@ -99,10 +124,100 @@ class RobinhoodRealMarket(RealTimeMarket):
     DECIMALS_SHARES = 6
     MIN_TRANS_AMOUNT = 1e-2
     MIN_TRANS_SHARES = 1e-6
+    DEFAULT_MIC = "XNYS"
+    # seconds to keep each kind of price during and outside trading hours
+    PRICE_TTL_OPEN = {"last": 30, "extended": 30, "bid": 15, "ask": 15}
+    PRICE_TTL_CLOSED = {"last": 900, "extended": 900, "bid": 3600, "ask": 3600}
 
     def __init__(self):
         pass
 
+    @classmethod
+    def prefetch_prices(cls, symbols):
+        """
+        Fetch quotes of multiple symbols in a single request.
+        Later price lookups hit the shared cache until it expires.
+        Best-effort: on failure, lookups fall back to per-symbol requests.
+        """
+        symbols = list(symbols)
+        if not symbols:
+            return
+        try:
+            quotes = rh.get_quotes(symbols)
+        except RequestException as e:
+            cls._cls_warn(f"Batched quote request failed: {e}")
+            return
+        if not quotes:
+            cls._cls_warn(f"No quotes returned for {symbols}")
+            return
+        ttl_dict = cls.price_ttl_dict(cls.DEFAULT_MIC)
+        for _quote in quotes:
+            if not _quote:
+                continue
+            _symbol = _quote["symbol"]
+            _last = _quote["last_trade_price"]
+            _extended = _quote["last_extended_hours_trade_price"] or _last
+            for _kind, _price in [
+                ("last", _last),
+                ("extended", _extended),
+                ("bid", _quote["bid_price"]),
+                ("ask", _quote["ask_price"]),
+            ]:
+                if _price is not None:
+                    cls.store_price((_symbol, _kind), float(_price), ttl_dict[_kind])
+
+    @classmethod
+    def price_ttl_dict(cls, mic):
+        """
+        Seconds to cache each kind of price, depending on market hours.
+        Outside trading hours, entries never outlive the next open.
+        Unknown hours fall back to the short TTLs.
+        """
+        until_open = seconds_until_open(mic)
+        if not until_open:
+            return cls.PRICE_TTL_OPEN
+        return {
+            _kind: min(_ttl, until_open) for _kind, _ttl in cls.PRICE_TTL_CLOSED.items()
+        }
+
+    @classmethod
+    def cached_price(cls, symbol, kind, fetcher, mic=None):
+        """
+        Look up a price in the shared cache, calling fetcher() on a miss.
+        The per-key lock spans the lookup and the request, so other keys are
+        not blocked while one is fetched, and each key is fetched only once.
+        """
+        key = (symbol, kind)
+        with PRICE_CACHE_LOCK:
+            key_lock = PRICE_KEY_LOCKS[key]
+
+        with key_lock:
+            with PRICE_CACHE_LOCK:
+                entry = PRICE_CACHE.get(key)
+            if entry is not None:
+                return entry[0]
+
+            # warm restart: load from disk, keeping the remaining lifetime
+            price, expire_time = price_disk_cache().get(key, expire_time=True)
+            if price is not None:
+                with PRICE_CACHE_LOCK:
+                    PRICE_CACHE[key] = (price, max(expire_time - time.time(), 0.0))
+                return price
+
+            price = fetcher()
+            ttl = cls.price_ttl_dict(mic or cls.DEFAULT_MIC)[kind]
+            cls.store_price(key, price, ttl)
+            return price
+
+    @classmethod
+    def store_price(cls, key, price, ttl):
+        """
+        Write a price to both the in-memory and the on-disk cache.
+        """
+        with PRICE_CACHE_LOCK:
+            PRICE_CACHE[key] = (price, ttl)
+        price_disk_cache().set(key, price, expire=ttl)
+
     @classmethod
     def round_shares(cls, shares, floor=False):
         if floor:
@@ -165,17 +280,26 @@ class RobinhoodRealMarket(RealTimeMarket):
         return order
 
     def get_price(self, symbol):
-        price_list = rh.stocks.get_latest_price(symbol, includeExtendedHours=False)
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.stocks.get_latest_price(symbol, includeExtendedHours=False)
+            return list(map(float, price_list))[0]
+
+        return self.__class__.cached_price(symbol, "last", fetcher)
 
     def get_bid_price(self, symbol):
-        price_list = rh.stocks.get_latest_price(
-            symbol, "bid_price", includeExtendedHours=False
-        )
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.stocks.get_latest_price(
+                symbol, "bid_price", includeExtendedHours=False
+            )
+            return list(map(float, price_list))[0]
+
+        return self.__class__.cached_price(symbol, "bid", fetcher)
 
     def get_ask_price(self, symbol, time=None):
-        price_list = rh.stocks.get_latest_price(
-            symbol, "ask_price", includeExtendedHours=False
-        )
-        return list(map(float, price_list))[0]
+        def fetcher():
+            price_list = rh.stocks.get_latest_price(
+                symbol, "ask_price", includeExtendedHours=False
+            )
+            return list(map(float, price_list))[0]
+
+        return self.__class__.cached_price(symbol, "ask", fetcher)
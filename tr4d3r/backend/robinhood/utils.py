@@ -1,12 +1,39 @@
 import re
 import robin_stocks.robinhood as rh
+from robin_stocks.robinhood.globals import SESSION
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta, timezone
 from functools import lru_cache
+from tr4d3r.utils.misc import utcnow
+
+HOURS_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+# (mic, date) -> market hours; only successful replies are kept
+MARKET_HOURS_CACHE = {}
+# symbol -> MIC; a failed lookup ("N/A") is never kept
+SYMBOL_MIC_CACHE = {}
+
+
+def configure_session(pool_size=16):
+    """
+    Widen the connection pool of RobinStocks' shared session.
+    The session is already reused across calls, but threaded ticks can run more
+    simultaneous requests than the default pool keeps alive.
+    """
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    SESSION.mount("https://", adapter)
+    SESSION.headers["Connection"] = "keep-alive"
+    return SESSION
 
 
 def symbol_to_market_mic(symbol):
     """
     Get the MIC value of the market for a specified symbol.
+    Cached since listings do not move between markets within a session.
+    Failed lookups return "N/A" and are not cached, so the next call retries.
     """
+    if symbol in SYMBOL_MIC_CACHE:
+        return SYMBOL_MIC_CACHE[symbol]
+
     markets = rh.get_instruments_by_symbols(symbol, info="market")
 
     if not markets:
@@ -16,6 +43,7 @@ def symbol_to_market_mic(symbol):
         len(markets) == 1
     ), f"Expecting exactly one market for symbol {symbol}, got {markets}"
     mic = re.search(r"[A-Z]{4}\/$", markets[0]).group()[:-1]
+    SYMBOL_MIC_CACHE[symbol] = mic
     return mic
 
 
@@ -30,3 +58,45 @@ def cached_order_info(order_id):
     symbol = rh.get_instrument_by_url(order_dict["instrument"], info="symbol")
     order_dict["symbol"] = symbol
     return order_dict
+
+
+def cached_market_hours(mic, date_str):
+    """
+    A cached version of get_market_hours.
+    The date is in the key, so each market is looked up once per day.
+    Failed requests return None and are not cached, so the next call retries.
+    """
+    key = (mic, date_str)
+    if key not in MARKET_HOURS_CACHE:
+        hours = rh.markets.get_market_hours(mic, date_str)
+        if not hours:
+            return None
+        MARKET_HOURS_CACHE[key] = hours
+    return MARKET_HOURS_CACHE[key]
+
+
+def parse_hours_time(hours, key):
+    return datetime.strptime(hours[key], HOURS_FORMAT).replace(tzinfo=timezone.utc)
+
+
+def seconds_until_open(mic, lookahead_days=7):
+    """
+    Seconds until the next regular session of a market opens.
+    0.0 while the market is open; None if its hours cannot be determined.
+    """
+    now_utc = utcnow()
+    for _offset in range(lookahead_days + 1):
+        _date_str = (now_utc + timedelta(days=_offset)).strftime("%Y-%m-%d")
+        _hours = cached_market_hours(mic, _date_str)
+        if not _hours:
+            return None
+        if not _hours.get("is_open"):
+            continue
+
+        _opens_at = parse_hours_time(_hours, "opens_at")
+        _closes_at = parse_hours_time(_hours, "closes_at")
+        if _opens_at <= now_utc < _closes_at:
+            return 0.0
+        if now_utc < _opens_at:
+            return (_opens_at - now_utc).total_seconds()
+    return None
@@ -12,7 +12,16 @@ class Loggable:
     [`Rich` style guide](https://rich.readthedocs.io/en/latest/style.html)
     """
 
+    # no instance attributes here; subclasses may declare their own slots
+    __slots__ = ()
+
     CONSOLE = Console()
+    # messages above this level are skipped; set to "warn" or "fail" to quiet down
+    LEVEL = "info"
+    _LEVELS = {"fail": 0, "warn": 1, "info": 2, "good": 2}
+
+    def _should_log(self, level):
+        return self.__class__._cls_should_log(level)
 
     def _print(self, *args, **kwargs):
         self.__class__._cls_print(*args, **kwargs)
@@ -29,6 +38,10 @@ class Loggable:
     def _fail(self, message):
         self.__class__._cls_fail(message)
 
+    @classmethod
+    def _cls_should_log(cls, level):
+        return cls._LEVELS[level] <= cls._LEVELS[cls.LEVEL]
+
     @classmethod
     def _cls_print(cls, *args, **kwargs):
         cls.CONSOLE.print(*args, **kwargs)
@@ -51,6 +64,8 @@ class Loggable:
 
     @classmethod
     def _cls_good(cls, message):
+        if not cls._cls_should_log("good"):
+            return
         cls.CONSOLE.print(
             f":green_circle: {cls.__name__}: {message}",
             style="green",
@@ -58,10 +73,14 @@ class Loggable:
 
     @classmethod
     def _cls_info(cls, message):
+        if not cls._cls_should_log("info"):
+            return
         cls.CONSOLE.print(f":blue_circle: {cls.__name__}: {message}", style="blue")
 
     @classmethod
     def _cls_warn(cls, message):
+        if not cls._cls_should_log("warn"):
+            return
         cls.CONSOLE.print(
             f":yellow_circle: {cls.__name__}: {message}",
             style="yellow",
@@ -69,4 +88,6 @@ class Loggable:
 
     @classmethod
     def _cls_fail(cls, message):
+        if not cls._cls_should_log("fail"):
+            return
         cls.CONSOLE.print(f":red_circle: {cls.__name__}: {message}", style="red")
@@ -10,6 +10,8 @@ class Asset(Loggable):
     Anything of value.
     """
 
+    __slots__ = ("_name", "_quantity")
+
     def __init__(self, name, quantity):
         self._name = name
         self._quantity = quantity
@@ -54,6 +56,8 @@ class Cash(Asset):
     Whatever is used for purchases and for measuring value.
     """
 
+    __slots__ = ()
+
     def __init__(self, name, quantity):
         super().__init__(name, quantity)
 
@@ -107,6 +111,8 @@ class Item(Asset):
     Whatever is purchased and has variable value.
     """
 
+    __slots__ = ("_unit_cost",)
+
     def __init__(self, name, quantity, unit_cost):
         super().__init__(name, quantity)
         self._unit_cost = unit_cost
@@ -197,6 +203,8 @@ class PseudoTimeItem(Item):
     Item for pseudo-time simulation where the market can be a variable.
     """
 
+    __slots__ = ("_market",)
+
     from .market import PseudoTimeMarket
 
     COMPATIBLE_MARKETS = {
@@ -92,6 +92,12 @@ class RealTimeMarket(Loggable):
     Base class for real-time markets.
     """
 
+    def prefetch_prices(self, symbols):
+        """
+        Placeholder for child class logic, e.g. batched quote requests.
+        """
+        pass
+
     @abstractmethod
     def market_buy(self, symbol, shares=None, amount=None, **kwargs):
         pass
@@ -20,18 +20,20 @@ class Simulation(Loggable):
         TODO: cache sequences and load when a new sequence is a contiguous subset with the same start.
         """
         timed_callbacks = timed_callbacks or {}
+        time_sequence = list(time_sequence)
 
-        data_entries = []
-        for _time in tqdm(time_sequence, desc="Simulation step"):
+        # record data in preallocated columns rather than a dict per step
+        manager.init_history(len(time_sequence))
+        for _i, _time in enumerate(tqdm(time_sequence, desc="Simulation step")):
             # find any callback and trigger it
             if _time in timed_callbacks.keys():
                 _callback = timed_callbacks[_time]
                 _callback(_time)
             # regular read/write subroutine
-            data_entries.append(manager.tick_read(folio, _time))
+            manager.tick_read(folio, _time, index=_i)
             manager.tick_write(folio, _time)
 
-        df = pd.DataFrame(data_entries)
+        df = pd.DataFrame(manager.history())
         info = {
             "portfolio": folio,
             "market": self.market,
@@ -1,10 +1,75 @@
 from tr4d3r.core import Loggable
 from tr4d3r.utils.misc import datetime_to_string, utcnow
-from collections import defaultdict
 from abc import abstractmethod
-import dill as pickle
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from types import MappingProxyType
+import math
+import numpy as np
+import pickle
+import dill
 import wrappy
 
+# log lines of the real-time subroutine, formatted only when printed
+TARGET_WORTH_TEMPLATE = (
+    "{symbol} worth : tar. {tar:.2f} ({tar_pct:.2f}%) | cur. {cur:.2f} ({cur_pct:.2f}%)"
+)
+DETAIL_WORTH_TEMPLATE = (
+    "{symbol} worth : ava. {ava:.2f} | ord. {ord:.2f} | bid-ask {bid:.2f}-{ask:.2f}"
+)
+ORDER_TEMPLATE = "{action}: {symbol} | {amount:.6f} {currency}"
+
+
+class TickHistory:
+    """
+    Columnar storage of tick_read data: one preallocated array per column.
+    """
+
+    BASE_KEYS = ("principal", "worth", "% cash")
+
+    def __init__(self, n_ticks, keys):
+        self.size = n_ticks
+        self.filled = 0
+        self.columns = {"time": np.empty(n_ticks, dtype=object)}
+        for _key in [*self.__class__.BASE_KEYS, *keys]:
+            self.column(_key)
+
+    def column(self, key):
+        """
+        Get a column, allocating it as NaN if the key is new, e.g. a new symbol.
+        """
+        if key not in self.columns:
+            self.columns[key] = np.full(self.size, np.nan, dtype=np.float64)
+        return self.columns[key]
+
+    def row(self, index):
+        assert (
+            0 <= index < self.size
+        ), f"Expected index in [0, {self.size}), got {index}"
+        self.filled = max(self.filled, index + 1)
+        return TickHistoryRow(self, index)
+
+    def view(self):
+        """
+        Column name -> array view of the rows written so far.
+        """
+        return {_k: _v[: self.filled] for _k, _v in self.columns.items()}
+
+
+class TickHistoryRow:
+    """
+    Dict-like writer into a single row of a TickHistory.
+    """
+
+    __slots__ = ("_history", "_index")
+
+    def __init__(self, history, index):
+        self._history = history
+        self._index = index
+
+    def __setitem__(self, key, value):
+        self._history.column(key)[self._index] = value
+
 
 def capped_daily_progression(seconds, step=0.03, cap=0.5):
     assert 0.0 < step <= 1.0, f"Expected 0.0 < step <= 1.0, got {step}"
@@ -21,59 +86,167 @@ class EquilibriumPortfolioManager(Loggable):
     """
 
     DEFAULT_PROGRESSION_FUNC = capped_daily_progression
+    # number of ratios from which linear_update switches to NumPy
+    VECTORIZE_MIN_ENTRIES = 500
 
     def __init__(self, equilibrium, params=None):
         """
         equilibrium: symbol -> target_ratio dict.
         """
         self._initial_equilibrium = equilibrium.copy()
-        self._running_equilibrium = equilibrium.copy()
+        # immutable (symbol, ratio) pairs; the dict view is built lazily
+        self._equilibrium_items = tuple(equilibrium.items())
+        self._equilibrium_dict = None
+        self._tick_read_keys = self.__class__.make_tick_read_keys(equilibrium)
+        self._history = None
         self.params = params or {}
+        self.validate_progression_params()
+
+        # skip a tick that starts while the previous one is still running
+        self._tick_lock = Lock()
 
     def __repr__(self):
         return self.params.get("name", self.__class__.__name__)
 
+    def validate_progression_params(self):
+        """
+        Check the default progression's rate and cap once, not every tick.
+        """
+        step = self.params.get("step", 0.03)
+        cap = self.params.get("cap", 0.5)
+        assert 0.0 < step <= 1.0, f"Expected 0.0 < step <= 1.0, got {step}"
+        assert 0.0 < cap <= 1.0, f"Expected 0.0 < cap <= 1.0, got {cap}"
+
+    def progression_step(self, gap_seconds):
+        """
+        Fraction of the gap to equilibrium to close, given seconds since last tick.
+        """
+        progression = self.params.get(
+            "progression_func", self.__class__.DEFAULT_PROGRESSION_FUNC
+        )
+        if progression is capped_daily_progression:
+            # inlined, with arguments validated at construction
+            step = min(
+                self.params.get("cap", 0.5),
+                self.params.get("step", 0.03) * (gap_seconds / 86400),
+            )
+        else:
+            step = progression(gap_seconds)
+        assert step <= 1.0, f"Step size too large: {step}"
+        return step
+
     @property
     def initial_equilibrium(self):
         return self._initial_equilibrium
 
     @property
     def equilibrium(self):
-        return self._running_equilibrium
+        """
+        Read-only view; assign a new dict to change the running equilibrium.
+        """
+        if self._equilibrium_dict is None:
+            self._equilibrium_dict = MappingProxyType(dict(self._equilibrium_items))
+        return self._equilibrium_dict
 
     @equilibrium.setter
     def equilibrium(self, equil_dict):
+        equil_items = tuple(equil_dict.items())
+        if equil_items == self._equilibrium_items:
+            return
         self._info(f"Setting new equilibrium {equil_dict}")
         assert sum(equil_dict.values()) <= 1.0 - self.params.get(
             "cash_ratio", 0.03
         ), "Too much total ratio for items"
-        self._running_equilibrium = equil_dict.copy()
+        self._equilibrium_items = equil_items
+        self._equilibrium_dict = None
+        if list(equil_dict) != list(self._tick_read_keys):
+            self._tick_read_keys = self.__class__.make_tick_read_keys(equil_dict)
+
+    def init_history(self, n_ticks):
+        """
+        Preallocate columnar storage for tick_read(..., index=i) calls.
+        """
+        keys = [_k for _keys in self._tick_read_keys.values() for _k in _keys]
+        self._history = TickHistory(n_ticks, keys)
+        return self._history
+
+    def history(self):
+        """
+        Columns of tick_read data recorded since init_history.
+        """
+        return self._history.view()
+
+    def tick_read_row(self, index):
+        """
+        A fresh dict if index is None, otherwise a write-only TickHistoryRow
+        into the history from init_history.
+        """
+        if index is None:
+            return dict()
+        return self._history.row(index)
+
+    @staticmethod
+    def make_tick_read_keys(symbols):
+        """
+        Column names of tick_read data for each symbol, built once per symbol set.
+        """
+        return {_s: (f"P:{_s}", f"Q:{_s}", f"C:{_s}", f"% {_s}") for _s in symbols}
 
     def linear_update(self, equil_dictl, coefficients):
         """
         Update the running equilibrium as a linear combination of equilibria.
         """
-        # initialize unnormalized linear combination
-        raw_combination = defaultdict(float)
-        total_coeff = 0.0
-
-        # collect weighted ratios for each symbol
+        assert len(equil_dictl) == len(
+            coefficients
+        ), f"Expected one coefficient per equilibrium, got {len(coefficients)}"
+        # the total ratio supplied by each equil_dict must not exceed 1.0-cash
+        limit = 1.0 - self.params.get("cash_ratio", 0.03)
+
+        # plain Python beats NumPy's setup cost on small inputs
+        num_entries = sum(len(_d) for _d in equil_dictl)
+        if num_entries < self.__class__.VECTORIZE_MIN_ENTRIES:
+            combine = self.__class__._python_combination
+        else:
+            combine = self.__class__._numpy_combination
+        self.equilibrium = combine(equil_dictl, coefficients, limit)
+
+    @staticmethod
+    def _python_combination(equil_dictl, coefficients, limit):
+        raw_combination = dict()
         for _dict, _coeff in zip(equil_dictl, coefficients):
-            # the total ratio supplied by each equil_dict must not exceed 1.0-cash
-            _total_ratio = 0.0
+            assert all(
+                _r >= 0.0 for _r in _dict.values()
+            ), f"Expected non-negative ratios, got {_dict}"
+            assert math.fsum(_dict.values()) <= limit, "Too much total ratio for items"
             for _symbol, _ratio in _dict.items():
-                assert _ratio >= 0.0, f"Expected non-negative ratio, got {_ratio}"
+                # symbols with a positive ratio are kept even if weighted to zero
                 if _ratio > 0.0:
-                    raw_combination[_symbol] += _ratio * _coeff
-                    _total_ratio += _ratio
-            assert _total_ratio <= 1.0 - self.params.get(
-                "cash_ratio", 0.03
-            ), "Too much total ratio for items"
-            total_coeff += _coeff
+                    raw_combination[_symbol] = (
+                        raw_combination.get(_symbol, 0.0) + _ratio * _coeff
+                    )
+
+        total_coeff = math.fsum(coefficients)
+        return {_k: _v / total_coeff for _k, _v in raw_combination.items()}
+
+    @staticmethod
+    def _numpy_combination(equil_dictl, coefficients, limit):
+        coefficients = np.asarray(coefficients, dtype=np.float64)
+
+        # align ratios into an (equilibria x symbols) matrix, symbols in seen order
+        symbols = list(dict.fromkeys(_s for _d in equil_dictl for _s in _d))
+        symbol_idx = {_s: _i for _i, _s in enumerate(symbols)}
+        matrix = np.zeros((len(equil_dictl), len(symbols)), dtype=np.float64)
+        for _i, _dict in enumerate(equil_dictl):
+            for _symbol, _ratio in _dict.items():
+                matrix[_i, symbol_idx[_symbol]] = _ratio
 
-        # normalize and set as new equilibrium
-        new_equilibrium = {_k: _v / total_coeff for _k, _v in raw_combination.items()}
-        self.equilibrium = new_equilibrium
+        assert (matrix >= 0.0).all(), f"Expected non-negative ratios, got {matrix}"
+        assert (matrix.sum(axis=1) <= limit).all(), "Too much total ratio for items"
+
+        # keep symbols with a positive ratio anywhere, even if weighted to zero
+        combination = (coefficients @ matrix) / coefficients.sum()
+        keep = (matrix > 0.0).any(axis=0)
+        return {symbols[_i]: float(combination[_i]) for _i in np.flatnonzero(keep)}
 
     @abstractmethod
     def tick_read(self, folio, **kwargs):
@@ -85,46 +258,93 @@ class EquilibriumPortfolioManager(Loggable):
 
     @classmethod
     def load_pickle(cls, pkl_path):
+        """
+        Try stdlib pickle first and fall back to dill for dill dumps.
+        """
         with open(pkl_path, "rb") as f:
-            pkl_dict = pickle.load(f)
+            pkl_bytes = f.read()
+        try:
+            pkl_dict = pickle.loads(pkl_bytes)
+        except (ImportError, AttributeError, pickle.UnpicklingError):
+            pkl_dict = dill.loads(pkl_bytes)
         equil_dict = pkl_dict["equilibrium"]
         param_dict = pkl_dict["params"]
         return cls(equil_dict, param_dict)
 
+    @classmethod
+    def _importable_callables(cls, obj):
+        """
+        Whether every callable in obj can be found by import in another process.
+        Stdlib pickle stores functions by reference, so e.g. a function defined in
+        __main__ would pickle fine here but fail to load anywhere else.
+        """
+        if isinstance(obj, dict):
+            return all(cls._importable_callables(_v) for _v in obj.values())
+        if isinstance(obj, (list, tuple, set)):
+            return all(cls._importable_callables(_v) for _v in obj)
+        if callable(obj):
+            module = getattr(obj, "__module__", None)
+            qualname = getattr(obj, "__qualname__", "<")
+            return module not in {None, "__main__"} and "<" not in qualname
+        return True
+
     def dump_pickle(self, pkl_path):
+        """
+        Use stdlib pickle if params hold no callables, or only callables from
+        importable modules. Otherwise, e.g. a progression_func defined in a script
+        or notebook or as a lambda, use dill which stores functions by value.
+        """
         pkl_dict = {
-            "equilibrium": self.equilibrium,
+            "equilibrium": dict(self.equilibrium),
             "params": self.params,
         }
+        pkl_bytes = None
+        if self.__class__._importable_callables(self.params):
+            try:
+                pkl_bytes = pickle.dumps(pkl_dict, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, AttributeError, TypeError):
+                pass
+        if pkl_bytes is None:
+            self._info("Using dill for params that stdlib pickle cannot restore")
+            pkl_bytes = dill.dumps(pkl_dict)
         with open(pkl_path, "wb") as f:
-            pickle.dump(pkl_dict, f)
+            f.write(pkl_bytes)
 
 
 class PseudoTimeEquilibrium(EquilibriumPortfolioManager):
-    def tick_read(self, folio, time):
+    def tick_read(self, folio, time, index=None):
         """
         Gather data for analysis.
+        Returns a dict, or with an index, writes into the history from
+        init_history instead and returns None.
         """
         worth = folio.worth(time)
-        data = {
-            "time": time,
-            "principal": folio.principal.quantity,
-            "worth": worth,
-            "% cash": 100 * folio.cash.worth() / worth,
-        }
-        for _symbol in self.equilibrium.keys():
-            data[f"P:{_symbol}"] = folio.market.get_price(_symbol, time)
-            data[f"Q:{_symbol}"] = folio[_symbol].quantity
-            data[f"C:{_symbol}"] = folio[_symbol].unit_cost
-            data[f"% {_symbol}"] = 100 * folio[_symbol].worth(time) / worth
+        data = self.tick_read_row(index)
+        data["time"] = time
+        data["principal"] = folio.principal.quantity
+        data["worth"] = worth
+        data["% cash"] = 100 * folio.cash.worth() / worth
+        for _symbol, _keys in self._tick_read_keys.items():
+            _item = folio[_symbol]
+            _pk, _qk, _ck, _rk = _keys
+            data[_pk] = folio.market.get_price(_symbol, time)
+            data[_qk] = _item.quantity
+            data[_ck] = _item.unit_cost
+            data[_rk] = 100 * _item.worth(time) / worth
 
-        return data
+        return data if index is None else None
 
     def tick_write(self, folio, time):
         """
         Make trading decisions and update the last time of making moves.
         """
         gap_seconds = folio.tick(time)
+        # pseudo-time trades happen at the market price, preserving total worth
+        folio_worth = folio.worth(time)
+
+        # determine "step size"
+        step = self.progression_step(gap_seconds)
+
         for _symbol, _ratio in self.equilibrium.items():
             # determine if item exists and then its worth
             _item = folio[_symbol]
@@ -132,86 +352,120 @@ class PseudoTimeEquilibrium(EquilibriumPortfolioManager):
             _bid_worth = _item.bid_worth(time) if _item_exists else 0.0
             _ask_worth = _item.ask_worth(time) if _item_exists else 0.0
 
-            # determine "step size"
-            _target_worth = _ratio * folio.worth(time)
-            _step = self.params.get(
-                "progression_func", self.__class__.DEFAULT_PROGRESSION_FUNC
-            )(gap_seconds)
-            assert _step <= 1.0, f"Step size too large: {_step}"
+            _target_worth = _ratio * folio_worth
 
             # market orders toward equilibrium
             # ask_worth is always above bid_worth
             if _target_worth > _ask_worth:
-                _amount = (_target_worth - _ask_worth) * _step
+                _amount = (_target_worth - _ask_worth) * step
                 folio.market_buy(_symbol, amount=_amount, time=time)
             elif _item_exists and _target_worth < _bid_worth:
-                _amount = (_bid_worth - _target_worth) * _step
+                _amount = (_bid_worth - _target_worth) * step
                 folio.market_sell(_symbol, amount=_amount, time=time)
             else:
                 pass
 
 
 class RealTimeEquilibrium(EquilibriumPortfolioManager):
-    def tick_read(self, folio):
+    def tick_read(self, folio, index=None):
         """
         Gather data for analysis.
+        Returns a dict, or with an index, writes into the history from
+        init_history instead and returns None.
         """
+        folio.market.prefetch_prices(list(self.equilibrium.keys()))
         worth = folio.worth()
-        data = {
-            "time": utcnow(),
-            "principal": folio.principal.quantity,
-            "worth": worth,
-            "% cash": 100 * folio.cash.worth() / worth,
-        }
-        for _symbol in self.equilibrium.keys():
+        data = self.tick_read_row(index)
+        data["time"] = utcnow()
+        data["principal"] = folio.principal.quantity
+        data["worth"] = worth
+        data["% cash"] = 100 * folio.cash.worth() / worth
+        for _symbol, _keys in self._tick_read_keys.items():
+            _item = folio[_symbol]
+            _pk, _qk, _ck, _rk = _keys
             _price = folio.market.get_price(_symbol)
-            _quantity = folio[_symbol].quantity
-            data[f"P:{_symbol}"] = _price
-            data[f"Q:{_symbol}"] = _quantity
-            data[f"C:{_symbol}"] = folio[_symbol].unit_cost
-            data[f"% {_symbol}"] = 100 * (_price * _quantity) / worth
+            _quantity = _item.quantity
+            data[_pk] = _price
+            data[_qk] = _quantity
+            data[_ck] = _item.unit_cost
+            data[_rk] = 100 * (_price * _quantity) / worth
 
-        return data
+        return data if index is None else None
 
     def tick_write(self, folio, execute=False):
         """
         Make trading decisions and update the last time of making moves.
+        Skips if another tick of this manager is still in progress.
+        """
+        if not self._tick_lock.acquire(blocking=False):
+            self._warn("Tick in progress, skipping")
+            return 0
+        try:
+            return self._locked_tick_write(folio, execute)
+        finally:
+            self._tick_lock.release()
+
+    def _locked_tick_write(self, folio, execute):
+        """
+        Subroutine of tick_write, to be called while holding the tick lock.
         """
         prev_datetime = datetime_to_string(folio.last_tick_time)
         gap_seconds = folio.tick(update=execute)
         self._info(f"Gap {gap_seconds} seconds since {prev_datetime}")
+        # overlap the quote and open order requests; worth then hits the cache
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            prices_future = executor.submit(
+                folio.market.prefetch_prices, list(self.equilibrium.keys())
+            )
+            orders_future = executor.submit(folio.open_order_values)
+            prices_future.result()
+            open_order_values = orders_future.result()
         folio_worth = folio.worth()
-        open_order_values = folio.open_order_values()
 
-        @wrappy.guard(fallback_retval=0, print_traceback=True)
-        def subroutine(symbol, ratio):
+        # determine "step size"
+        step = self.progression_step(gap_seconds)
+        deadband = self.params.get("deadband", 0.002)
+
+        def rebalance(symbol, ratio, log):
             # determine if item exists and then its worth
             item = folio[symbol]
             item_exists = item.name == symbol
             ava_worth = item.worth() if item_exists else 0.0
-            bid_worth = item.bid_worth() if item_exists else 0.0
-            ask_worth = item.ask_worth() if item_exists else 0.0
             # adjust estimated worth based on open order
             ord_worth = open_order_values[symbol]
             cur_worth = ava_worth + ord_worth
-            bid_worth += ord_worth
-            ask_worth += ord_worth
 
-            # determine "step size"
+            # skip bid-ask lookups when already close to the target
             cur_ratio = cur_worth / folio_worth
+            if abs(cur_ratio - ratio) < deadband:
+                log("info", f"{symbol} within dead-band, staying put.")
+                return
             target_worth = ratio * folio_worth
-            step = self.params.get(
-                "progression_func", self.__class__.DEFAULT_PROGRESSION_FUNC
-            )(gap_seconds)
-            assert step <= 1.0, f"Step size too large: {step}"
+            bid_worth = (item.bid_worth() if item_exists else 0.0) + ord_worth
+            ask_worth = (item.ask_worth() if item_exists else 0.0) + ord_worth
 
             # calculate tentative market order toward equilibrium
-            self._info(
-                f"{symbol} worth : tar. {round(target_worth, 2)} ({round(ratio*100, 2)}%) | cur. {round(cur_worth, 2)} ({round(cur_ratio*100, 2)}%)"
-            )
-            self._info(
-                f"{symbol} worth : ava. {round(ava_worth, 2)} | ord. {round(ord_worth, 2)} | bid-ask {round(bid_worth, 2)}-{round(ask_worth, 2)}"
-            )
+            if self._should_log("info"):
+                log(
+                    "info",
+                    TARGET_WORTH_TEMPLATE.format(
+                        symbol=symbol,
+                        tar=target_worth,
+                        tar_pct=ratio * 100,
+                        cur=cur_worth,
+                        cur_pct=cur_ratio * 100,
+                    ),
+                )
+                log(
+                    "info",
+                    DETAIL_WORTH_TEMPLATE.format(
+                        symbol=symbol,
+                        ava=ava_worth,
+                        ord=ord_worth,
+                        bid=bid_worth,
+                        ask=ask_worth,
+                    ),
+                )
             if target_worth > ask_worth:
                 amount = (target_worth - cur_worth) * step
                 action = "market buy"
@@ -221,18 +475,45 @@ class RealTimeEquilibrium(EquilibriumPortfolioManager):
                 action = "market sell"
                 func = folio.market_sell
             else:
-                self._info(f"{symbol} near equilibrium, staying put.")
+                log("info", f"{symbol} near equilibrium, staying put.")
+                return
 
             # make market order
-            base_msg = f"{action}: {symbol} | {round(amount, 6)} {folio.cash.name}"
+            base_msg = ORDER_TEMPLATE.format(
+                action=action, symbol=symbol, amount=amount, currency=folio.cash.name
+            )
             if execute:
-                self._warn(f"attempting {base_msg}")
+                log("warn", f"attempting {base_msg}")
                 info = func(symbol, amount=amount)
-                self._warn(f"placed {base_msg}\n{info}")
+                log("warn", f"placed {base_msg}\n{info}")
             else:
-                self._info(f"fake {base_msg}")
+                log("info", f"fake {base_msg}")
 
-        for _symbol, _ratio in self.equilibrium.items():
-            subroutine(_symbol, _ratio)
+        @wrappy.guard(fallback_retval=0, print_traceback=True)
+        def subroutine(symbol, ratio):
+            # group info lines per symbol, so threaded output stays readable;
+            # a warning flushes them right away, e.g. before placing an order
+            entries = []
+
+            def log(level, msg):
+                entries.append(msg)
+                if level == "warn":
+                    self._warn("\n".join(entries))
+                    entries.clear()
+
+            try:
+                rebalance(symbol, ratio, log)
+            finally:
+                if entries:
+                    self._info("\n".join(entries))
+
+        # each symbol mostly waits on network requests, so overlap them
+        symbol_ratio_pairs = list(self.equilibrium.items())
+        if symbol_ratio_pairs:
+            max_workers = min(
+                self.params.get("max_workers", 8), len(symbol_ratio_pairs)
+            )
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                list(executor.map(lambda _pair: subroutine(*_pair), symbol_ratio_pairs))
 
         return gap_seconds